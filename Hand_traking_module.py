@@ -11,14 +11,23 @@ class HandDetector:
         maxHands (int): The maximum number of hands to detect.
         detection_confidence (float): Minimum confidence value for hand detection.
         tracking_confidence (float): Minimum confidence value for hand tracking.
+        process_scale (float): Uniform factor the image is downsampled by before detection.
+        model_complexity (int): Complexity of the hand landmark model, 0 (lite) or 1 (full).
         mpHands: MediaPipe hands solution.
         hands: MediaPipe Hands object for processing images.
         mpDraw: MediaPipe utility for drawing landmarks on the image.
         tipIDs (list): List of landmark IDs corresponding to finger tips.
+        lmlist (list): Landmark positions found by the last FindPosition call.
     """
 
     def __init__(
-        self, mode=False, maxHands=2, detection_confidence=0.5, tracking_confidence=0.5
+        self,
+        mode=False,
+        maxHands=2,
+        detection_confidence=0.5,
+        tracking_confidence=0.5,
+        process_scale=0.5,
+        model_complexity=0,
     ):
         """
         Initializes the HandDetector class.
@@ -28,17 +37,22 @@ class HandDetector:
             maxHands (int, optional): Maximum number of hands to detect. Defaults to 2.
             detection_confidence (float, optional): Minimum confidence for hand detection. Defaults to 0.5.
             tracking_confidence (float, optional): Minimum confidence for hand tracking. Defaults to 0.5.
+            process_scale (float, optional): Uniform factor the image is downsampled by before detection. Defaults to 0.5.
+            model_complexity (int, optional): Complexity of the hand landmark model, 0 (lite) or 1 (full). Defaults to 0.
         """
         self.mode = mode
         self.maxHands = maxHands
         self.detection_confidence = detection_confidence
         self.tracking_confidence = tracking_confidence
+        self.process_scale = process_scale
+        self.model_complexity = model_complexity
 
         # Initialize Mediapipe hands solution
         self.mpHands = mp.solutions.hands
         self.hands = self.mpHands.Hands(
             static_image_mode=self.mode,
             max_num_hands=self.maxHands,
+            model_complexity=self.model_complexity,
             min_detection_confidence=self.detection_confidence,
             min_tracking_confidence=self.tracking_confidence,
         )
@@ -57,7 +71,17 @@ class HandDetector:
         Returns:
             ndarray: The processed image with drawn hand landmarks (if draw=True).
         """
-        imgRGB = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        # Landmarks are normalized, so detecting on a smaller copy does not
+        # change the positions found on the full-resolution image. The scale is
+        # uniform to keep the hand's aspect ratio whatever the camera delivers.
+        imgSmall = cv2.resize(
+            img,
+            None,
+            fx=self.process_scale,
+            fy=self.process_scale,
+            interpolation=cv2.INTER_AREA,
+        )
+        imgRGB = cv2.cvtColor(imgSmall, cv2.COLOR_BGR2RGB)
         self.results = self.hands.process(imgRGB)
 
         if self.results.multi_hand_landmarks:
@@ -69,7 +93,7 @@ class HandDetector:
 
         return img
 
-    def FindPosition(self, img, handNo=0, draw=True):
+    def FindPosition(self, img, handNo=0, draw=True, mirror=False):
         """
         Finds the position of hand landmarks in the input image.
 
@@ -77,6 +101,9 @@ class HandDetector:
             img (ndarray): The image in which the hand landmarks are located.
             handNo (int, optional): Index of the hand to analyze. Defaults to 0.
             draw (bool, optional): If True, draws circles at landmark positions. Defaults to True.
+            mirror (bool, optional): If True, mirrors the x coordinates, giving positions in the horizontally
+                                     flipped image. The circles are still drawn at the unmirrored positions,
+                                     on the hand in `img`. Defaults to False.
 
         Returns:
             list: A list of landmark positions in the format [id, cx, cy], where `id` is the landmark index,
@@ -85,16 +112,19 @@ class HandDetector:
         self.lmlist = []
         if self.results.multi_hand_landmarks:
             myHand = self.results.multi_hand_landmarks[handNo]
+            h, w, c = img.shape
 
             for id, lm in enumerate(myHand.landmark):
-                h, w, c = img.shape
                 # Get the position in pixels
                 cx, cy = int(lm.x * w), int(lm.y * h)
-                self.lmlist.append([id, cx, cy])
 
                 if draw:
                     cv2.circle(img, (cx, cy), 15, (255, 0, 255), cv2.FILLED)
 
+                if mirror:
+                    cx = int((1.0 - lm.x) * w)
+                self.lmlist.append([id, cx, cy])
+
         return self.lmlist
 
     def FingersUP(self):
@@ -102,8 +132,12 @@ class HandDetector:
         Determines which fingers are up based on landmark positions.
 
         Returns:
-            list: A list of integers representing the state of each finger (1 for up, 0 for down).
+            list: A list of integers representing the state of each finger (1 for up, 0 for down),
+                  empty if no hand was found.
         """
+        if len(self.lmlist) == 0:
+            return []
+
         fingers = []
 
         # Thumb
@@ -1,7 +1,11 @@
 import cv2
 import os
+import functools
 import numpy as np
 import time
+import queue
+import threading
+import traceback
 from Hand_traking_module import HandDetector
 import math
 
@@ -42,18 +46,37 @@ class VirtualPainter:
 
     Attributes:
         folder_path (str): Path to the folder containing overlay images.
-        overlay_lst (list): List of overlay images used for UI.
-        header (numpy.ndarray): Current header image.
+        use_opencl (bool): Whether compositing runs on an OpenCL device through cv2.UMat.
+        overlay_lst (tuple): Overlay images used for UI, resized to the 1280x100 header slot. cv2.UMat if
+                             `use_opencl`, numpy.ndarray otherwise.
+        header (cv2.UMat or numpy.ndarray): Current header image, of the same type as `overlay_lst`.
         drawing_color (tuple): Current drawing color in BGR format.
+        palette (list): (color, overlay index, mask value) for each header region, as BGR colors.
+        mask_value (int): Mask value written by the current drawing color, 0 for the eraser.
+        color_lut (numpy.ndarray): Palette index of the header region at each x-coordinate, -1 outside the regions.
         brush_size (int): Size of the drawing brush.
         eraser_size (int): Size of the eraser brush.
-        img_canvas (numpy.ndarray): Canvas for drawing.
+        current_thickness (int): Line thickness of the current drawing color.
+        img_canvas (cv2.UMat or numpy.ndarray): Canvas for drawing, cv2.UMat if `use_opencl`.
+        mask (cv2.UMat or numpy.ndarray): Single-channel mask of the painted pixels on the canvas,
+                                          cv2.UMat if `use_opencl`.
+        frame_buf (numpy.ndarray): Reused buffer the webcam frames are decoded into.
+        flip_buf (numpy.ndarray): Reused buffer the mirrored frames are written into.
         xp (int): Previous x-coordinate of the drawing point.
         yp (int): Previous y-coordinate of the drawing point.
         cap (cv2.VideoCapture): Video capture object for webcam.
         detector (HandDetector): Hand detector instance.
+        frame_q (queue.Queue): Single-slot queue of frames waiting for hand detection.
+        result_q (queue.Queue): Single-slot queue of the latest detection results.
+        lmlist (list): Most recent hand landmark positions.
+        fingers (list): Most recent finger states.
+        worker (threading.Thread): Background thread running hand detection.
         prev_time (float): Previous frame timestamp for FPS calculation.
         current_time (float): Current frame timestamp for FPS calculation.
+        fps_ema (float): Exponential moving average of the FPS.
+        fps_text (str): FPS label drawn on the frame, refreshed every `fps_interval` frames.
+        fps_interval (int): Number of frames between FPS label updates.
+        frame_count (int): Number of frames processed so far.
     """
 
     def __init__(self, folder_path="header"):
@@ -65,43 +88,138 @@ class VirtualPainter:
         """
         # Initialize parameters
         self.folder_path = folder_path
-        self.overlay_lst = self.load_overlays()
+        # The T-API only pays off with a device, on the CPU fallback the per-frame
+        # upload makes it much slower than compositing on the host
+        self.use_opencl = cv2.ocl.haveOpenCL() and cv2.ocl.useOpenCL()
+        self.overlay_lst = self.load_overlays(self.folder_path)
+        if self.use_opencl:
+            self.overlay_lst = tuple(cv2.UMat(overlay) for overlay in self.overlay_lst)
         self.header = self.overlay_lst[0]
         self.drawing_color = (0, 0, 255)  # Red
+        self.palette = [
+            ((0, 0, 255), 0, 255),  # Red
+            ((0, 255, 0), 1, 255),  # Green
+            ((255, 0, 255), 3, 255),  # Pink
+            ((0, 0, 0), 2, 0),  # Eraser
+        ]
+        self.mask_value = 255
+        self.color_lut = np.full(1280, -1, np.int8)
+        self.color_lut[51:250] = 0
+        self.color_lut[376:575] = 1
+        self.color_lut[701:900] = 2
+        self.color_lut[1026:1175] = 3
         self.brush_size = 8
         self.eraser_size = 50
+        self.current_thickness = self.brush_size
         self.img_canvas = np.zeros((720, 1280, 3), np.uint8)
+        self.mask = np.zeros((720, 1280), np.uint8)
+        if self.use_opencl:
+            self.img_canvas = cv2.UMat(self.img_canvas)
+            self.mask = cv2.UMat(self.mask)
+        self.frame_buf = np.empty((720, 1280, 3), np.uint8)
+        self.flip_buf = np.empty((720, 1280, 3), np.uint8)
         self.xp, self.yp = 0, 0
 
         # Set up video capture
         self.cap = cv2.VideoCapture(0)
+        self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*"MJPG"))
         self.cap.set(3, 1280)  # Width
         self.cap.set(4, 720)  # Height
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Keep only the latest frame
 
         # Initialize Hand Detector
         self.detector = HandDetector(detection_confidence=0.85)
 
+        # Set up the hand detection worker
+        self.frame_q = queue.Queue(maxsize=1)
+        self.result_q = queue.Queue(maxsize=1)
+        self.lmlist, self.fingers = [], []
+        self.worker = threading.Thread(target=self.detect_hands, daemon=True)
+
         # Initialize FPS variables
-        self.prev_time = 0
+        self.prev_time = time.time()
         self.current_time = 0
+        self.fps_ema = 0.0
+        self.fps_text = "FPS: 0"
+        self.fps_interval = 10
+        self.frame_count = 0
 
-    def load_overlays(self):
+    @classmethod
+    def load_overlays(cls, folder_path):
         """
-        Loads overlay images from the specified folder.
+        Loads overlay images from the given folder in file name order, resized to fit the header.
+        The result is cached per absolute folder path, so the images are only decoded once.
+        Files that cannot be read as images are skipped.
+
+        Args:
+            folder_path (str): Path to the folder containing overlay images.
 
         Returns:
-            list: A list of images loaded as overlays.
+            tuple: The images loaded as overlays, as read-only arrays shared between callers.
+
+        Raises:
+            ValueError: If the folder contains no readable images.
         """
+        return cls._load_overlays(os.path.abspath(folder_path))
+
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def _load_overlays(cls, folder_path):
         overlay_lst = []
-        header_lst = os.listdir(self.folder_path)
+        header_lst = sorted(os.listdir(folder_path))
         for img_path in header_lst:
-            header_img = cv2.imread(os.path.join(self.folder_path, img_path))
+            header_img = cv2.imread(
+                os.path.join(folder_path, img_path), cv2.IMREAD_COLOR
+            )
+            if header_img is None:
+                continue
+            header_img = cv2.resize(
+                header_img, (1280, 100), interpolation=cv2.INTER_AREA
+            )
+            header_img = np.ascontiguousarray(header_img, dtype=np.uint8)
+            header_img.setflags(write=False)
             overlay_lst.append(header_img)
-        return overlay_lst
+
+        if not overlay_lst:
+            raise ValueError(f"No overlay images could be read from {folder_path}")
+        return tuple(overlay_lst)
+
+    @staticmethod
+    def put_latest(q, item):
+        """
+        Puts an item into a single-slot queue, discarding the item already in it.
+
+        Args:
+            q (queue.Queue): The queue to put the item into.
+            item: The item to put.
+        """
+        try:
+            q.get_nowait()
+        except queue.Empty:
+            pass
+        q.put_nowait(item)
+
+    def detect_hands(self):
+        """
+        Detects hands on queued frames, meant to run in the background worker thread.
+        A frame that fails detection is reported and treated as having no hand, so the
+        painter does not keep drawing at a stale position.
+        """
+        while True:
+            img = self.frame_q.get()
+            try:
+                img = self.detector.FindHands(img, draw=False)
+                lmlist = self.detector.FindPosition(img, draw=False, mirror=True)
+                fingers = self.detector.FingersUP() if len(lmlist) != 0 else []
+            except Exception:
+                traceback.print_exc()
+                lmlist, fingers = [], []
+            self.put_latest(self.result_q, (lmlist, fingers))
 
     def process_frame(self, img):
         """
-        Processes a single video frame, detecting hands and drawing on the canvas.
+        Processes a single video frame, queueing it for hand detection and drawing
+        on the canvas with the latest detection results.
 
         Args:
             img (numpy.ndarray): The input video frame.
@@ -109,34 +227,34 @@ class VirtualPainter:
         Returns:
             numpy.ndarray: The processed video frame with drawings.
         """
-        img = cv2.flip(img, 1)
-        img = self.detector.FindHands(img)
-        lmlist = self.detector.FindPosition(img, draw=False)
+        # Detect on the unmirrored frame so MediaPipe sees the camera's natural
+        # motion, and mirror the landmarks instead
+        self.put_latest(self.frame_q, img.copy())
+        img = cv2.flip(img, 1, dst=self.flip_buf)
+        try:
+            self.lmlist, self.fingers = self.result_q.get_nowait()
+        except queue.Empty:
+            pass
+        lmlist, fingers = self.lmlist, self.fingers
 
         if len(lmlist) != 0:
             # tip of index and middle fingers
             x1, y1 = lmlist[8][1:]
             x2, y2 = lmlist[12][1:]
 
-            # Check which fingers are up
-            fingers = self.detector.FingersUP()
-
             # If Selection mode - 2 fingers are up
             if fingers[1] and fingers[2]:
                 self.xp, self.yp = 0, 0
-                if y1 < 110:
-                    if 50 < x1 < 250:
-                        self.header = self.overlay_lst[0]
-                        self.drawing_color = (0, 0, 255)  # Red
-                    elif 375 < x1 < 575:
-                        self.header = self.overlay_lst[1]
-                        self.drawing_color = (0, 255, 0)  # Green
-                    elif 700 < x1 < 900:
-                        self.header = self.overlay_lst[3]
-                        self.drawing_color = (255, 0, 255)  # Pink
-                    elif 1025 < x1 < 1175:
-                        self.header = self.overlay_lst[2]
-                        self.drawing_color = (0, 0, 0)  # Eraser
+                if y1 < 110 and 0 <= x1 < len(self.color_lut):
+                    i = self.color_lut[x1]
+                    if i >= 0:
+                        self.drawing_color, overlay, self.mask_value = self.palette[i]
+                        self.header = self.overlay_lst[overlay]
+                        self.current_thickness = (
+                            self.eraser_size
+                            if self.mask_value == 0
+                            else self.brush_size
+                        )
                 cv2.rectangle(
                     img, (x1, y1 - 25), (x2, y2 + 25), self.drawing_color, cv2.FILLED
                 )
@@ -144,6 +262,8 @@ class VirtualPainter:
             # Find distance of the of hand for the brush size
             hand_distance = HandDistance.FindDistance(lmlist=lmlist)
             self.brush_size = HandDistance.Find_BrushSize(distance=hand_distance)
+            if self.mask_value != 0:
+                self.current_thickness = self.brush_size
 
             # If Drawing mode - 1 finger is up
             if fingers[1] and not fingers[2]:
@@ -152,36 +272,27 @@ class VirtualPainter:
                 if self.xp == 0 and self.yp == 0:
                     self.xp, self.yp = x1, y1
 
-                if self.drawing_color == (0, 0, 0):
-                    cv2.line(
-                        img,
-                        (self.xp, self.yp),
-                        (x1, y1),
-                        self.drawing_color,
-                        self.eraser_size,
-                    )
-                    cv2.line(
-                        self.img_canvas,
-                        (self.xp, self.yp),
-                        (x1, y1),
-                        self.drawing_color,
-                        self.eraser_size,
-                    )
-                else:
-                    cv2.line(
-                        img,
-                        (self.xp, self.yp),
-                        (x1, y1),
-                        self.drawing_color,
-                        self.brush_size,
-                    )
-                    cv2.line(
-                        self.img_canvas,
-                        (self.xp, self.yp),
-                        (x1, y1),
-                        self.drawing_color,
-                        self.brush_size,
-                    )
+                cv2.line(
+                    img,
+                    (self.xp, self.yp),
+                    (x1, y1),
+                    self.drawing_color,
+                    self.current_thickness,
+                )
+                cv2.line(
+                    self.img_canvas,
+                    (self.xp, self.yp),
+                    (x1, y1),
+                    self.drawing_color,
+                    self.current_thickness,
+                )
+                cv2.line(
+                    self.mask,
+                    (self.xp, self.yp),
+                    (x1, y1),
+                    self.mask_value,
+                    self.current_thickness,
+                )
 
                 self.xp, self.yp = x1, y1
 
@@ -195,13 +306,17 @@ class VirtualPainter:
             img (numpy.ndarray): The input video frame.
 
         Returns:
-            numpy.ndarray: The combined frame with the drawings and overlay.
+            cv2.UMat or numpy.ndarray: The combined frame with the drawings and overlay,
+                                       a cv2.UMat if `use_opencl`.
         """
-        img_gray = cv2.cvtColor(self.img_canvas, cv2.COLOR_BGR2GRAY)
-        _, img_inverse = cv2.threshold(img_gray, 50, 255, cv2.THRESH_BINARY_INV)
-        img_inverse = cv2.cvtColor(img_inverse, cv2.COLOR_GRAY2BGR)
-        img = cv2.bitwise_and(img, img_inverse)
-        img = cv2.bitwise_or(img, self.img_canvas)
+        if self.use_opencl:
+            # The frame stays a UMat from here on, so it is never downloaded again
+            img = cv2.UMat(img)
+            cv2.copyTo(self.img_canvas, self.mask, img)
+            cv2.copyTo(self.header, None, cv2.UMat(img, [0, 100], [0, 1280]))
+            return img
+
+        cv2.copyTo(self.img_canvas, self.mask, img)
         img[0:100, 0:1280] = self.header
         return img
 
@@ -210,18 +325,28 @@ class VirtualPainter:
         Adds the current FPS (frames per second) to the video frame.
 
         Args:
-            img (numpy.ndarray): The input video frame.
+            img (cv2.UMat or numpy.ndarray): The input video frame.
 
         Returns:
-            numpy.ndarray: The video frame with the FPS added.
+            cv2.UMat or numpy.ndarray: The video frame with the FPS added.
         """
         self.current_time = time.time()
-        fps = 1 / (self.current_time - self.prev_time)
+        dt = self.current_time - self.prev_time
         self.prev_time = self.current_time
+        if dt > 0:
+            if self.fps_ema == 0.0:
+                # Seed with the first sample rather than blending up from zero
+                self.fps_ema = 1.0 / dt
+            else:
+                self.fps_ema = 0.9 * self.fps_ema + 0.1 * (1.0 / dt)
+
+        self.frame_count += 1
+        if self.frame_count % self.fps_interval == 0:
+            self.fps_text = f"FPS: {int(self.fps_ema)}"
 
         cv2.putText(
             img,
-            f"FPS: {int(fps)}",
+            self.fps_text,
             (10, 50),
             cv2.FONT_HERSHEY_SIMPLEX,
             1,
@@ -235,8 +360,10 @@ class VirtualPainter:
         """
         Runs the virtual painter application, continuously processing video frames.
         """
+        self.worker.start()
+
         while True:
-            success, img = self.cap.read()
+            success, img = self.cap.read(self.frame_buf)
             if not success:
                 break
 
@@ -247,7 +374,8 @@ class VirtualPainter:
             # Show the image
             cv2.imshow("Virtual Painter", img)
 
-            if cv2.waitKey(1) & 0xFF == ord("q"):
+            # Poll the key without the minimum 1 ms wait of waitKey
+            if cv2.pollKey() & 0xFF == ord("q"):
                 break
 
         # Release resources